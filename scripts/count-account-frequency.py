@@ -1,20 +1,22 @@
 import sys
+import numpy as np
+from collections import Counter
 
-get_ops = set(["getstate", "getcodehash", "getnonce", "getbalance"])
-put_ops = set(["setstate", "setcode", "setnonce", "setbalance", "createaccount", "addbalance", "subbalance"])
+get_ops = frozenset([b"getstate", b"getcodehash", b"getnonce", b"getbalance"])
+put_ops = frozenset([b"setstate", b"setcode", b"setnonce", b"setbalance", b"createaccount", b"addbalance", b"subbalance"])
+ops = get_ops | put_ops
 
-accounts = {}
+with open(sys.argv[1], "rb") as trace:
+    parts = (line.split() for line in trace)
+    accounts = Counter(p[1] for p in parts if len(p) >= 2 and p[0] in ops)
 
-for line in open(sys.argv[1]):
-    parts = line.strip().split()
-    if len(parts) < 2:
-        continue
-    if parts[0] in get_ops or parts[0] in put_ops:
-        acc = parts[1]
-        if acc not in accounts:
-            accounts[acc] = 1
-        accounts[acc] += 1
+accs = np.array(list(accounts.keys()))
+freqs = np.fromiter(accounts.values(), dtype=np.int64, count=len(accounts))
+order = np.lexsort((accs, -freqs))
 
-output = open(sys.argv[2], "w")
-for acc, freq in sorted(accounts.items(), key=lambda kv: (-kv[1], kv[0])):
-    output.write("{} {}\n".format(acc, freq))
\ No newline at end of file
+WRITE_ROWS = 1 << 20
+
+with open(sys.argv[2], "wb") as output:
+    for start in range(0, len(order), WRITE_ROWS):
+        rows = order[start:start + WRITE_ROWS]
+        output.write(b"".join(b"%s %d\n" % kv for kv in zip(accs[rows].tolist(), freqs[rows].tolist())))
\ No newline at end of file
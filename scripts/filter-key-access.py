@@ -1,22 +1,31 @@
 import sys
 
-get_ops = set(["getstate", "getcodehash", "getnonce", "getbalance"])
-put_ops = set(["setstate", "setcodehash", "setnonce", "setbalance", "createaccount", "addbalance", "subbalance"])
-no_ops = set(["newstatedb", "commit", "blocknum", "revertsnapshot", "snapshot", "finalise", "removeaccount"])
+get_ops = frozenset([b"getstate", b"getcodehash", b"getnonce", b"getbalance"])
+put_ops = frozenset([b"setstate", b"setcodehash", b"setnonce", b"setbalance", b"createaccount", b"addbalance", b"subbalance"])
+no_ops = frozenset([b"newstatedb", b"commit", b"blocknum", b"revertsnapshot", b"snapshot", b"finalise", b"removeaccount"])
+state_ops = frozenset([b"getstate", b"setstate"])
 
-output = open(sys.argv[2], "w")
-for line in open(sys.argv[1]):
-    parts = line.strip().split()
-    if len(parts) < 2:
-        continue
-    if parts[0] in get_ops:
-        if parts[0] == "getstate":
-            output.write("get {} {}\n".format(parts[1], parts[2]))
-        else:
-            output.write("get {}\n".format(parts[1]))
-    elif parts[0] in put_ops:
-        if parts[0] == "setstate":
-            output.write("put {} {}\n".format(parts[1], parts[2]))
-        else:
-            output.write("put {}\n".format(parts[1]))
-    
\ No newline at end of file
+table = {op: b"get " for op in get_ops}
+table.update({op: b"put " for op in put_ops})
+
+FLUSH_SIZE = 1 << 20
+
+with open(sys.argv[1], "rb") as trace, open(sys.argv[2], "wb", buffering=FLUSH_SIZE) as output:
+    buf = bytearray()
+    for line in trace:
+        parts = line.split()
+        if len(parts) < 2:
+            continue
+        op = table.get(parts[0])
+        if op is None:
+            continue
+        buf += op
+        buf += parts[1]
+        if parts[0] in state_ops:
+            buf += b" "
+            buf += parts[2]
+        buf += b"\n"
+        if len(buf) > FLUSH_SIZE:
+            output.write(buf)
+            buf.clear()
+    output.write(buf)
\ No newline at end of file
@@ -1,24 +1,123 @@
+import os
 import sys
-import random
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
 
-keys = []
-freq = []
+# Vose's alias method, vectorized: every under-full column i is topped up by
+# the over-full column whose cumulative surplus covers the cumulative deficit
+# before i; an over-full column that drops below 1 is topped up by the next one.
+def build_alias(freq):
+    n = len(freq)
+    prob = np.ones(n, dtype=np.float32)
+    alias = np.arange(n, dtype=np.int32)
+    if n == 0:
+        return prob, alias
+    p = np.array(freq, dtype=np.float64)
+    p *= n / np.sum(p)
+    small = np.flatnonzero(p < 1).astype(np.int32)
+    large = np.flatnonzero(p >= 1).astype(np.int32)
+    # With no over-full column, rounding alone pushed some p just below 1;
+    # every column is effectively full and keeps prob = 1.
+    if len(small) > 0 and len(large) > 0:
+        # Built in place to keep only one float64 temporary per column alive.
+        deficit = p[small]
+        prob[small] = deficit
+        np.subtract(1, deficit, out=deficit)
+        np.cumsum(deficit, out=deficit)
+        surplus = p[large]
+        del p
+        surplus -= 1
+        np.cumsum(surplus, out=surplus)
+        # Compare against the deficit before each small column using the same
+        # cumsum, so donor and drained below agree exactly on ties.
+        donor = np.empty(len(small), dtype=np.int32)
+        donor[0] = np.searchsorted(surplus, 0.0, side='right')
+        donor[1:] = np.searchsorted(surplus, deficit[:-1], side='right')
+        np.minimum(donor, len(large) - 1, out=donor)
+        alias[small] = large[donor]
+        drained = np.searchsorted(deficit, surplus[:-1], side='left')
+        np.minimum(drained, len(small) - 1, out=drained)
+        # Only a column the donor chain has reached gives anything up; leading
+        # columns with zero surplus (p == 1) are never drawn on and stay full.
+        used = donor[drained] <= np.arange(len(large) - 1)
+        prob[large[:-1][used]] = np.clip(1 - (deficit[drained[used]] - surplus[:-1][used]), 0, 1)
+        alias[large[:-1]] = large[1:]
+    return prob, alias
 
-for line in open(sys.argv[1]):
-    parts = line.strip().split()
-    keys.append(parts[0])
-    freq.append(int(parts[1]))
+# Read "key freq" lines into a fixed-width bytes array and an int64 array.
+# Lines are counted first so both arrays are allocated once and filled one
+# chunk at a time; only a chunk's keys ever exist as Python strings.
+def load_keys(path, chunk_rows=1 << 16):
+    with open(path, "rb") as f:
+        nlines = sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 24), b"")) + 1
+    keys = np.empty(nlines, dtype="S1")
+    freq = np.empty(nlines, dtype=np.int64)
+    if os.path.getsize(path) == 0:
+        return keys[:0], freq[:0]
+    n = 0
+    for chunk in pd.read_csv(path, sep=" ", names=["key", "freq"], dtype={"key": str, "freq": np.int64}, chunksize=chunk_rows):
+        chunk_keys = chunk["key"].to_numpy().astype(bytes)
+        if chunk_keys.dtype.itemsize > keys.dtype.itemsize:
+            keys = keys.astype(chunk_keys.dtype)
+        keys[n:n + len(chunk)] = chunk_keys
+        freq[n:n + len(chunk)] = chunk["freq"].to_numpy()
+        n += len(chunk)
+    return keys[:n], freq[:n]
+
+# Runs in a forked worker, which shares keys/prob/alias with the parent.
+def generate_batch(seed, k):
+    rng = np.random.default_rng(seed)
+    i = rng.integers(0, n, size=k)
+    u = rng.random(k, dtype=np.float32)
+    sample_keys = keys[np.where(u < prob[i], i, alias[i])]
+    return b"\n".join(sample_keys.tolist()) + b"\n"
+
+def write_all(fd, buf):
+    buf = memoryview(buf)
+    while buf:
+        buf = buf[os.write(fd, buf):]
+
+keys, freq = load_keys(sys.argv[1])
 
 print(f"Loaded {len(keys)} keys...")
 
+prob, alias = build_alias(freq)
+n = len(keys)
+
 nops = int(sys.argv[2])
-output = open(sys.argv[3], "w")
 
 BATCH = 1_000_000
+sizes = [BATCH] * (nops // BATCH) + ([nops % BATCH] if nops % BATCH else [])
+seeds = np.random.SeedSequence(int(sys.argv[4]) if len(sys.argv) > 4 else None).spawn(len(sizes))
+# One worker per usable CPU, capped at 8 because up to 2 * workers finished
+# batches (~43 MB each) can be queued in the parent. BENCH_TRACE_WORKERS
+# overrides the count.
+if "BENCH_TRACE_WORKERS" in os.environ:
+    workers = int(os.environ["BENCH_TRACE_WORKERS"])
+elif hasattr(os, "sched_getaffinity"):
+    workers = min(len(os.sched_getaffinity(0)), 8)
+else:
+    workers = min(os.cpu_count() or 1, 8)
+workers = max(1, workers)
+
 remaining = nops
-while remaining > 0:
-    print(f"Generating {remaining} operations...")
-    k = BATCH if remaining > BATCH else remaining
-    sample_keys = random.choices(keys, weights=freq, k=k)
-    output.writelines(key + "\n" for key in sample_keys)
-    remaining -= k
\ No newline at end of file
+fd = os.open(sys.argv[3], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+try:
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as ex:
+        pending = deque()
+        tasks = zip(seeds, sizes)
+        while True:
+            for seed, k in itertools.islice(tasks, 2 * workers - len(pending)):
+                pending.append((ex.submit(generate_batch, seed, k), k))
+            if not pending:
+                break
+            batch, k = pending.popleft()
+            print(f"Generating {remaining} operations...")
+            write_all(fd, batch.result())
+            remaining -= k
+finally:
+    os.close(fd)
\ No newline at end of file
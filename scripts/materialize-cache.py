@@ -0,0 +1,18 @@
+import glob
+import importlib.util
+import os
+
+# Parse every microbenchmark log once so that micro-plot.py only has to
+# load the binary copies from cache/.
+spec = importlib.util.spec_from_file_location('micro_plot', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'micro-plot.py'))
+micro_plot = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(micro_plot)
+
+loaders = {'ficus': micro_plot.load_ficus_log, 'geth': micro_plot.load_geth_log, 'chainkv': micro_plot.load_chainkv_log}
+
+for ops in ['get', 'vget', 'put', 'lru']:
+    for log_file in sorted(glob.glob(f"../logs/{ops}/*.log")):
+        engine = os.path.basename(log_file).split('-')[2]
+        if engine in loaders:
+            print(f"Caching {log_file}...")
+            loaders[engine](log_file)
\ No newline at end of file
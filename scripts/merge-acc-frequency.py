@@ -1,16 +1,7 @@
 import sys
+import pandas as pd
 
-accounts = {}
-for file in sys.argv[1:-1]:
-    for line in open(file):
-        parts = line.strip().split()
-        if len(parts) < 2:
-            continue
-        acc = parts[0]
-        if acc not in accounts:
-            accounts[acc] = int(parts[1])
-        accounts[acc] += int(parts[1])
-
-output = open(sys.argv[-1], "w")
-for acc, freq in sorted(accounts.items(), key=lambda kv: (-kv[1], kv[0])):
-    output.write("{} {}\n".format(acc, freq))
\ No newline at end of file
+frames = [pd.read_csv(file, sep=" ", names=["acc", "freq"], dtype={"acc": str, "freq": "int64"}) for file in sys.argv[1:-1]]
+accounts = pd.concat(frames).groupby("acc", sort=False, as_index=False)["freq"].sum()
+accounts = accounts.sort_values(["freq", "acc"], ascending=[False, True])
+accounts.to_csv(sys.argv[-1], sep=" ", header=False, index=False)
\ No newline at end of file
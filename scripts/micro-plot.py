@@ -2,98 +2,121 @@ import matplotlib.pyplot as plt
 import numpy as np
 import sys
 import os
+import functools
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from matplotlib.ticker import PercentFormatter
 import matplotlib.gridspec as gridspec
 
 # FicusDB, Geth, ChainKV, FicusDB-LRU
 color = ['#EA6B66', '#7EA6E0', '#97D077', '#FFB570']
 
+cache_dir = 'cache'
+
+# Memoize a log loader in memory and on disk; the on-disk copy is reused
+# until the log's mtime changes.
+def cached_log(loader):
+    @functools.lru_cache(maxsize=None)
+    def load(log_file):
+        mtime = os.stat(log_file).st_mtime_ns
+        cache_file = os.path.join(cache_dir, f"{loader.__name__}-{os.path.basename(log_file)}.npz")
+        if os.path.exists(cache_file):
+            # A cache file that cannot be read is treated as a miss.
+            try:
+                with np.load(cache_file) as cached:
+                    if cached['mtime'] == mtime:
+                        return {item: cached[item] for item in cached.files if item != 'mtime'}
+            except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+                pass
+        data = loader(log_file)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file and rename it, so an interrupted run never
+        # leaves a truncated cache file behind.
+        with tempfile.NamedTemporaryFile(dir=cache_dir, suffix='.npz', delete=False) as f:
+            try:
+                np.savez(f, mtime=mtime, **data)
+            except BaseException:
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, cache_file)
+        return data
+    return load
+
+# Parse one whitespace-separated column out of a list of log lines.
+def parse_column(lines, col, dtype=np.float32):
+    return np.loadtxt(lines, usecols=col, dtype=dtype, comments=None, ndmin=1)
+
+def read_lines(log_file):
+    with open(log_file) as f:
+        return f.read().splitlines()
+
+def read_groups(log_file, group_len):
+    lines = read_lines(log_file)
+    return lines[:len(lines) // group_len * group_len]
+
+@cached_log
 def load_ficus_log(log_file):
     group_len = 12
-    entry = []
-    line_num = 0
-    data = {"trpt": [], "ratio": []}
-    for line in open(log_file):
-        line_num += 1
-        entry.append(line)
-        if line_num % group_len == 0:
-            trpt = float(entry[0].split()[3])
-            ratio = float(entry[4].split()[2])
-            data["trpt"].append(trpt)
-            data["ratio"].append(ratio)
-            entry = []
+    lines = read_groups(log_file, group_len)
+    data = {"trpt": parse_column(lines[0::group_len], 3),
+            "ratio": parse_column(lines[4::group_len], 2)}
     return data
 
+@cached_log
 def load_geth_log(log_file):
     group_len = 4
-    entry = []
-    line_num = 0
-    data = {"trpt": [], "ratio": []}
-    for line in open(log_file):
-        line_num += 1
-        entry.append(line)
-        if line_num % group_len == 0:
-            trpt = float(entry[0].split()[3])
-            ratio = float(entry[2].split()[4])
-            data["trpt"].append(trpt)
-            data["ratio"].append(ratio)
-            entry = []
+    lines = read_groups(log_file, group_len)
+    data = {"trpt": parse_column(lines[0::group_len], 3),
+            "ratio": parse_column(lines[2::group_len], 4)}
     return data
 
+@cached_log
 def load_chainkv_log(log_file):
-    data = {"trpt": []}
-    for line in open(log_file):
-        trpt = float(line.split()[3])
-        data["trpt"].append(trpt)
+    data = {"trpt": parse_column(read_lines(log_file), 3)}
     return data
 
-def get_ficus_log(key_size, ops, item, val_size=200, batch_size=2000):
-    data = []
-    for cache_size in [1024, 2048, 4096, 8192, 16384]:
+cache_sizes = [1024, 2048, 4096, 8192, 16384]
+
+# Load the logs of one engine for every cache size, one thread per log.
+def get_logs(engine, loader, key_size, ops, item, val_size, batch_size):
+    def load(cache_size):
         if ops == 'put':
-            log_file = f"../logs/put/micro-put-ficus-{key_size}-50m-{cache_size}-{val_size}-{batch_size}.log"
-            data.append(np.array(load_ficus_log(log_file)[item]))
+            log_file = f"../logs/put/micro-put-{engine}-{key_size}-50m-{cache_size}-{val_size}-{batch_size}.log"
         else:
-            log_file = f"../logs/{ops}/micro-{ops}-ficus-{key_size}-50m-{cache_size}.log"
-            data.append(np.array(load_ficus_log(log_file)[item]))
-    return data
+            log_file = f"../logs/{ops}/micro-{ops}-{engine}-{key_size}-50m-{cache_size}.log"
+        return np.asarray(loader(log_file)[item], dtype=np.float32)
+    with ThreadPoolExecutor(max_workers=len(cache_sizes)) as ex:
+        return list(ex.map(load, cache_sizes))
+
+def get_ficus_log(key_size, ops, item, val_size=200, batch_size=2000):
+    return get_logs('ficus', load_ficus_log, key_size, ops, item, val_size, batch_size)
 
 def get_geth_log(key_size, ops, item, val_size=200, batch_size=2000):
-    data = []
-    for cache_size in [1024, 2048, 4096, 8192, 16384]:
-        if ops == 'put':
-            log_file = f"../logs/put/micro-put-geth-{key_size}-50m-{cache_size}-{val_size}-{batch_size}.log"
-            data.append(np.array(load_geth_log(log_file)[item]))
-        else:
-            log_file = f"../logs/{ops}/micro-{ops}-geth-{key_size}-50m-{cache_size}.log"
-            data.append(np.array(load_geth_log(log_file)[item]))
-    return data
+    return get_logs('geth', load_geth_log, key_size, ops, item, val_size, batch_size)
 
 def get_chainkv_log(key_size, ops, item, val_size=200, batch_size=2000):
-    data = []
-    for cache_size in [1024, 2048, 4096, 8192, 16384]:
-        if ops == 'put':
-            log_file = f"../logs/put/micro-put-chainkv-{key_size}-50m-{cache_size}-{val_size}-{batch_size}.log"
-            data.append(np.array(load_chainkv_log(log_file)[item]))
-        else:
-            log_file = f"../logs/{ops}/micro-{ops}-chainkv-{key_size}-50m-{cache_size}.log"
-            data.append(np.array(load_chainkv_log(log_file)[item]))
-    return data
+    return get_logs('chainkv', load_chainkv_log, key_size, ops, item, val_size, batch_size)
+
+# Mean of each series after dropping its first `warmup` fraction.
+def steady_mean(logs, warmup):
+    return np.array([np.mean(t[int(len(t)*warmup):]) for t in logs])
 
 def plot_get(axs, key_size, ylim, title):
     warmup = 0.8
-    ficus_get = get_ficus_log(key_size, 'get', 'trpt')
-    ficus_get = np.array([np.mean(t[int(len(t)*warmup):]) for t in ficus_get])
-    ficus_vget = get_ficus_log(key_size, 'vget', 'trpt')
-    ficus_vget = np.array([np.mean(t[int(len(t)*warmup):]) for t in ficus_vget])
-    get_vget = get_geth_log(key_size, 'vget', 'trpt')
-    get_vget = np.array([np.mean(t[int(len(t)*warmup):]) for t in get_vget])
-    get_get = get_geth_log(key_size, 'get', 'trpt')
-    get_get = np.array([np.mean(t[int(len(t)*warmup):]) for t in get_get])
-    chainkv_vget = get_chainkv_log(key_size, 'vget', 'trpt')
-    chainkv_vget = np.array([np.mean(t[int(len(t)*warmup):]) for t in chainkv_vget])
-    chainkv_get = get_chainkv_log(key_size, 'get', 'trpt')
-    chainkv_get = np.array([np.mean(t[int(len(t)*warmup):]) for t in chainkv_get])
+    with ThreadPoolExecutor() as ex:
+        ficus_get = ex.submit(get_ficus_log, key_size, 'get', 'trpt')
+        ficus_vget = ex.submit(get_ficus_log, key_size, 'vget', 'trpt')
+        get_vget = ex.submit(get_geth_log, key_size, 'vget', 'trpt')
+        get_get = ex.submit(get_geth_log, key_size, 'get', 'trpt')
+        chainkv_vget = ex.submit(get_chainkv_log, key_size, 'vget', 'trpt')
+        chainkv_get = ex.submit(get_chainkv_log, key_size, 'get', 'trpt')
+    ficus_get = steady_mean(ficus_get.result(), warmup)
+    ficus_vget = steady_mean(ficus_vget.result(), warmup)
+    get_vget = steady_mean(get_vget.result(), warmup)
+    get_get = steady_mean(get_get.result(), warmup)
+    chainkv_vget = steady_mean(chainkv_vget.result(), warmup)
+    chainkv_get = steady_mean(chainkv_get.result(), warmup)
 
     memsize = ['1G', '2G', '4G', '8G', '16G']
     n_groups = len(memsize)
@@ -124,13 +147,13 @@ def plot_get(axs, key_size, ylim, title):
 def plot_put(axs, key_size, ylim, title):
     warmup = 0.8
     ficus_trpt = get_ficus_log(key_size, 'put', 'trpt')
-    ficus_trpt = np.array([np.mean(t[int(len(t)*warmup):]) for t in ficus_trpt])
+    ficus_trpt = steady_mean(ficus_trpt, warmup)
     
     geth_trpt = get_geth_log(key_size, 'put', 'trpt')
-    geth_trpt = np.array([np.mean(t[int(len(t)*warmup):]) for t in geth_trpt])
+    geth_trpt = steady_mean(geth_trpt, warmup)
     
     chainkv_trpt = get_chainkv_log(key_size, 'put', 'trpt')
-    chainkv_trpt = np.array([np.mean(t[int(len(t)*warmup):]) for t in chainkv_trpt])
+    chainkv_trpt = steady_mean(chainkv_trpt, warmup)
     
     memsize = ['1G', '2G', '4G', '8G', '16G']
     n_groups = len(memsize)
@@ -159,7 +182,7 @@ def plot_batch(axs, title, color):
         data[vs] = {}
         for bs in batch_size:
             log_file = f"../logs/put/micro-put-ficus-20m-50m-16384-{vs}-{bs}.log"
-            data[vs][bs] = np.array(load_ficus_log(log_file)['trpt'])
+            data[vs][bs] = np.asarray(load_ficus_log(log_file)['trpt'], dtype=np.float32)
     lines = []
     for vs in val_size:
         line = []
@@ -180,21 +203,17 @@ def plot_batch(axs, title, color):
 def plot_miss(axs, title):
     warmup = 0.8
     ficus_20m = get_ficus_log('20m', 'get', 'ratio')
-    ficus_20m = np.array([1-np.mean(t[int(len(t)*warmup):]) for t in ficus_20m])
+    ficus_20m = 1-steady_mean(ficus_20m, warmup)
     ficus_100m = get_ficus_log('100m', 'get', 'ratio')
-    ficus_100m = np.array([1-np.mean(t[int(len(t)*warmup):]) for t in ficus_100m])
+    ficus_100m = 1-steady_mean(ficus_100m, warmup)
     geth_20m = get_geth_log('20m', 'get', 'ratio')
-    geth_20m = np.array([1-np.mean(t[int(len(t)*warmup):]) for t in geth_20m])
+    geth_20m = 1-steady_mean(geth_20m, warmup)
     geth_100m = get_geth_log('100m', 'get', 'ratio')
-    geth_100m = np.array([1-np.mean(t[int(len(t)*warmup):]) for t in geth_100m])
-    lru_20m = []
-    for cache in [1024, 2048, 4096, 8192, 16384]:
-        file_name = f"../logs/lru/micro-lru-ficus-20m-50m-{cache}.log"
-        lru_20m.append(1-np.mean(np.array(load_ficus_log(file_name)['ratio'])[int(len(load_ficus_log(file_name)['ratio'])*warmup):]))
-    lru_100m = []
-    for cache in [1024, 2048, 4096, 8192, 16384]:
-        file_name = f"../logs/lru/micro-lru-ficus-100m-50m-{cache}.log"
-        lru_100m.append(1-np.mean(np.array(load_ficus_log(file_name)['ratio'])[int(len(load_ficus_log(file_name)['ratio'])*warmup):]))
+    geth_100m = 1-steady_mean(geth_100m, warmup)
+    lru_20m = get_ficus_log('20m', 'lru', 'ratio')
+    lru_20m = 1-steady_mean(lru_20m, warmup)
+    lru_100m = get_ficus_log('100m', 'lru', 'ratio')
+    lru_100m = 1-steady_mean(lru_100m, warmup)
 
     axs.plot(ficus_20m, marker='v', label = 'ficus-20m', color=color[0])
     axs.plot(ficus_100m, marker='o', label = 'ficus-100m', color=color[0], linestyle='--')
@@ -230,4 +249,5 @@ def plot_micro(filename):
     fig.savefig(filename, dpi=500)
     fig.clf()
 
-plot_micro('micro-plot.png')
\ No newline at end of file
+if __name__ == '__main__':
+    plot_micro('micro-plot.png')
\ No newline at end of file
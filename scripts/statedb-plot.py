@@ -4,44 +4,31 @@ from matplotlib.ticker import PercentFormatter, FuncFormatter, LogLocator
 
 color = ['#EA6B66', '#7EA6E0', '#97D077', '#FFB570']
 
+# Parse one whitespace-separated column out of a list of log lines.
+def parse_column(lines, col, dtype=np.float32):
+    return np.loadtxt(lines, usecols=col, dtype=dtype, comments=None, ndmin=1)
+
+def read_groups(log_file, group_len):
+    with open(log_file) as f:
+        lines = f.read().splitlines()
+    return lines[:len(lines) // group_len * group_len]
+
 def load_ficus_log(log_file):
     group_len = 19
-    entry = []
-    line_num = 0
-    data = {"trpt": [], "ratio": [], "time": [], "opget": [], "opput": []}
-    for line in open(log_file):
-        line_num += 1
-        entry.append(line)
-        if line_num % group_len == 0:
-            trpt = float(entry[3].split()[3])
-            ratio = float(entry[11].split()[2])
-            time = float(entry[1].split()[1])
-            opget = int(entry[3].split()[0])
-            opput = int(entry[3].split()[1])
-            data["trpt"].append(trpt)
-            data["ratio"].append(ratio)
-            data["time"].append(time)
-            data["opget"].append(opget)
-            data["opput"].append(opput)
-            entry = []
+    lines = read_groups(log_file, group_len)
+    data = {"trpt": parse_column(lines[3::group_len], 3),
+            "ratio": parse_column(lines[11::group_len], 2),
+            "time": parse_column(lines[1::group_len], 1),
+            "opget": parse_column(lines[3::group_len], 0, dtype=np.int32),
+            "opput": parse_column(lines[3::group_len], 1, dtype=np.int32)}
     return data
 
 def load_geth_log(log_file):
     group_len = 5
-    entry = []
-    line_num = 0
-    data = {"trpt": [], "ratio": [], "time": []}
-    for line in open(log_file):
-        line_num += 1
-        entry.append(line)
-        if line_num % group_len == 0:
-            trpt = float(entry[0].split()[4])
-            ratio = float(entry[3].split()[4])
-            time = float(entry[0].split()[1])
-            data["trpt"].append(trpt)
-            data["ratio"].append(ratio)
-            data["time"].append(time)
-            entry = []
+    lines = read_groups(log_file, group_len)
+    data = {"trpt": parse_column(lines[0::group_len], 4),
+            "ratio": parse_column(lines[3::group_len], 4),
+            "time": parse_column(lines[0::group_len], 1)}
     return data
 
 ficus_4 = load_ficus_log('../logs/statedb/ficus-statedb-4096.log')
@@ -50,17 +37,16 @@ geth_4 = load_geth_log('../logs/statedb/geth-statedb-4096.log')
 geth_32 = load_geth_log('../logs/statedb/geth-statedb-32768.log')
 
 def window_ave(a, w=10):
-    r = []
-    for i in range(0, len(a)+w, w):
-        r.append(sum(a[i:i+w])/w)
-    return r[:-1]
+    a = np.asarray(a, dtype=np.float32)
+    n = len(a) // w * w
+    return a[:n].reshape(-1, w).mean(axis=1)
 
 
 def plot_block_time(axs, title):
-    ficus_4_time = np.array(window_ave(ficus_4["time"], w=100))
-    ficus_32_time = np.array(window_ave(ficus_32["time"], w=100))
-    geth_4_time = np.array(window_ave(geth_4["time"], w=100))
-    geth_32_time = np.array(window_ave(geth_32["time"], w=100))
+    ficus_4_time = window_ave(ficus_4["time"], w=100)
+    ficus_32_time = window_ave(ficus_32["time"], w=100)
+    geth_4_time = window_ave(geth_4["time"], w=100)
+    geth_32_time = window_ave(geth_32["time"], w=100)
     n = len(ficus_4_time)
     x = [10000000+i*(2000000/n) for i in range(n)]
 
@@ -75,10 +61,10 @@ def plot_block_time(axs, title):
     axs.legend(ncol=2)
 
 def plot_trpt(axs, title):
-    ficus_4_trpt = np.array(window_ave(ficus_4["trpt"], w=100))/1000
-    ficus_32_trpt = np.array(window_ave(ficus_32["trpt"], w=100))/1000
-    geth_4_trpt = np.array(window_ave(geth_4["trpt"], w=100))/1000
-    geth_32_trpt = np.array(window_ave(geth_32["trpt"], w=100))/1000
+    ficus_4_trpt = window_ave(ficus_4["trpt"], w=100)/1000
+    ficus_32_trpt = window_ave(ficus_32["trpt"], w=100)/1000
+    geth_4_trpt = window_ave(geth_4["trpt"], w=100)/1000
+    geth_32_trpt = window_ave(geth_32["trpt"], w=100)/1000
     n = len(ficus_4_trpt)
     x = [10000000+i*(2000000/n) for i in range(n)]
     start = int(n*0.25)
@@ -92,8 +78,8 @@ def plot_trpt(axs, title):
     axs.legend(ncol=2)
 
 def plot_ops(axs, title):
-    get_ops = np.array(window_ave(ficus_4["opget"], w=100))/1000
-    put_ops = np.array(window_ave(ficus_4["opput"], w=100))/1000
+    get_ops = window_ave(ficus_4["opget"], w=100)/1000
+    put_ops = window_ave(ficus_4["opput"], w=100)/1000
     n = len(get_ops)
     x = [10000000+i*(2000000/n) for i in range(n)]
     start = int(n*0.25)
@@ -105,8 +91,8 @@ def plot_ops(axs, title):
     axs.set_title(title)
 
 def plot_miss_ratio(axs, title):
-    ficus_4_miss_ratio = 1-np.array(window_ave(ficus_4["ratio"], w=100))
-    geth_4_miss_ratio = 1-np.array(window_ave(geth_4["ratio"], w=100))
+    ficus_4_miss_ratio = 1-window_ave(ficus_4["ratio"], w=100)
+    geth_4_miss_ratio = 1-window_ave(geth_4["ratio"], w=100)
     n = len(ficus_4_miss_ratio)
     x = [10000000+i*(2000000/n) for i in range(n)]
     start = int(n*0.25)